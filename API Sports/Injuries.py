@@ -1,17 +1,14 @@
-import requests
 import json
+import os
 from My_Team import my_team
 from PFL_Weekly_Wrap import current_week
+from request_scheduler import default_scheduler, DeferredRequest, INJURIES
 
 
-creds = rf'API_SPORTS_KEY.json'
-with open(creds, 'r') as f:
-    api_data = json.load(f)
-    key = api_data['key']
-    url = "https://v1.american-football.api-sports.io/injuries"
+url = "https://v1.american-football.api-sports.io/injuries"
 
 
-all_players = rf"Week{current_week}\All_players.json"
+all_players = os.path.join(f"Week{current_week}", "All_players.json")
 player_ids = {}
 
 
@@ -28,17 +25,12 @@ for line in all_ids:
     values.append(line)
 
 
-def get_injuries(value):
-    payload = {}
-    headers = {
-        'x-rapidapi-key': key,
-        'x-rapidapi-host': 'v1.american-football.api-sports.io'
-    }
-    keys = {'player': value
+def get_injuries(value, scheduler=None):
+    scheduler = scheduler or default_scheduler()
+    return scheduler.submit(url, {'player': value}, priority=INJURIES)
 
-    }
-    response = requests.get(url, params=keys, headers=headers, data=payload)
-    data = response.json()
+
+def print_injuries(data):
     for line in data['response']:
         name = line['player']['name']
         status = line['status']
@@ -46,5 +38,12 @@ def get_injuries(value):
         print(f"{name}: {status} - {description}")
 
 
-for x in values:
-    get_injuries(x)
+scheduler = default_scheduler()
+tickets = [get_injuries(x, scheduler) for x in values]
+scheduler.run()
+if not scheduler.dry_run:
+    for ticket in tickets:
+        try:
+            print_injuries(ticket.result())
+        except DeferredRequest as e:
+            print(e)
@@ -1,9 +1,10 @@
-import requests
 import json
 import os
 from Team_IDs import teams, team_IDs, team_names, team_numbers, team_abbreviations
 from PFL_Weekly_Wrap import current_week
 from name_correction import replace_names
+from request_scheduler import default_scheduler, DeferredRequest, ROSTER_REFRESH
+from roster_snapshots import RosterSnapshots
 from icecream import ic
 import sqlite3
 
@@ -11,7 +12,6 @@ import sqlite3
 creds = rf'API_SPORTS_KEY.json'
 with open(creds, 'r') as f:
     api_data = json.load(f)
-    key = api_data['key']
     url = api_data['players']
 
 
@@ -21,7 +21,7 @@ def create_all_players_json():
     all_nfl_players = []
     skill_players = []
     skill_and_kickers = []
-    for filename in os.listdir(player_directory):
+    for filename in sorted(os.listdir(player_directory)):
         if filename.endswith('.json'):
             file_path = os.path.join(player_directory, filename)
             with open(file_path, 'r') as file:
@@ -57,32 +57,32 @@ def create_all_players_json():
         skill_and_kickers.append({teams[team_id]: {'team': teams[team_id], 'group': 'D/ST', 'position': 'D/ST',
                                                    'id': team_IDs[teams[team_id]]}})
 
-    with open(rf"Week{current_week}\All_players.json", 'w') as output_file:
+    week_dir = f"Week{current_week}"
+    os.makedirs(week_dir, exist_ok=True)
+    with open(os.path.join(week_dir, "All_players.json"), 'w') as output_file:
         json.dump(all_nfl_players, output_file)
 
-    with open(rf"Week{current_week}\Skill_players.json", 'w') as output_file:
+    with open(os.path.join(week_dir, "Skill_players.json"), 'w') as output_file:
         json.dump(skill_players, output_file)
-    with open(rf"Week{current_week}\Skill_and_kickers.json", 'w') as output_file:
+    with open(os.path.join(week_dir, "Skill_and_kickers.json"), 'w') as output_file:
         json.dump(skill_and_kickers, output_file)
 
-    print(f"All Players written to Week{current_week}\\All_players.json")
+    print(f"All Players written to {os.path.join(week_dir, 'All_players.json')}")
 
+    store = RosterSnapshots()
+    snapshot_id = store.save(all_nfl_players, label=week_dir)
+    print(f"Roster snapshot {snapshot_id} saved for {week_dir}")
+    store.close()
 
-def get_roster(team_id):
+
+def get_roster(team_id, scheduler=None):
     """API Request: Get roster for specified team_id"""
-    values = {
-        "team": f"{team_id}",
-        "season": "2025"
-    }
-    payload = {
-    }
-    headers = {
-        'x-rapidapi-key': key,
-        'x-rapidapi-host': 'v1.american-football.api-sports.io'
-    }
-    response = requests.get(url, params=values, headers=headers)
-    player_stats = response.json()
-    
+    scheduler = scheduler or default_scheduler()
+    return scheduler.submit(url, {"team": f"{team_id}", "season": "2025"}, priority=ROSTER_REFRESH)
+
+
+def save_roster(team_id, player_stats):
+    """Write a roster API response to Rosters/<team>_players.json"""
     # Create Rosters directory if it doesn't exist
     rosters_dir = "Rosters"
     if not os.path.exists(rosters_dir):
@@ -94,14 +94,28 @@ def get_roster(team_id):
         ic(f"{teams[team_id]} players dumped successfully")
 
 
-for team in team_names:
-    rosters_dir = "Rosters"
-    if not os.path.exists(rosters_dir):
-        os.makedirs(rosters_dir)
-    
-    roster_file = os.path.join(rosters_dir, f"{team}_players.json")
-    if not os.path.exists(roster_file):
-        get_roster(team_numbers[team])
+def refresh_missing_rosters(scheduler=None):
+    """Request rosters for every team without a Rosters file, through the shared scheduler"""
+    scheduler = scheduler or default_scheduler()
+    tickets = {}
+    for team in team_names:
+        roster_file = os.path.join("Rosters", f"{team}_players.json")
+        if not os.path.exists(roster_file):
+            tickets[team_numbers[team]] = get_roster(team_numbers[team], scheduler)
+
+    if not tickets:
+        return
+    scheduler.run()
+    if scheduler.dry_run:
+        return
+    for team_id, ticket in tickets.items():
+        try:
+            save_roster(team_id, ticket.result())
+        except DeferredRequest as e:
+            print(f"Skipped {teams[team_id]} roster: {e}")
+
+
+refresh_missing_rosters()
 
 
 def add_players_to_db():
@@ -0,0 +1,326 @@
+"""
+Shared scheduler for api-sports requests.
+
+Every script that talks to api-sports should go through a RequestScheduler so the
+daily quota is spent in one place:
+
+    scheduler = RequestScheduler()
+    ticket = scheduler.submit(url, {'team': 5, 'season': '2025'}, priority=ROSTER_REFRESH)
+    scheduler.run()
+    data = ticket.result()
+
+Identical requests (same url and params) are coalesced into a single call, calls
+are made in priority order, and every call is recorded in a per-day ledger in a
+local SQLite file.  When the remaining budget gets low, lower priority requests
+are deferred instead of sent.  Pass dry_run=True to see the plan without
+spending anything.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import Future
+from datetime import date
+
+import requests
+
+
+API_HOST = 'v1.american-football.api-sports.io'
+DAILY_LIMIT = 100
+LEDGER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api_usage.db')
+CREDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'API_SPORTS_KEY.json')
+
+# lower number = more important
+LIVE_STATS = 0
+INJURIES = 1
+ROSTER_REFRESH = 2
+
+priority_names = {
+    LIVE_STATS: 'live stats',
+    INJURIES: 'injuries',
+    ROSTER_REFRESH: 'roster refresh',
+}
+
+# calls that must still be left in today's budget before a request of this
+# priority is allowed to go out
+priority_reserve = {
+    LIVE_STATS: 0,
+    INJURIES: 10,
+    ROSTER_REFRESH: 25,
+}
+
+
+class DeferredRequest(Exception):
+    """Raised from Ticket.result() when a request was held back to save quota"""
+
+
+def request_key(url, params=None):
+    """Stable key used to coalesce identical requests"""
+    params = params or {}
+    return url, tuple(sorted((str(k), str(v)) for k, v in params.items()))
+
+
+def load_key(creds=CREDS_PATH):
+    with open(creds, 'r') as f:
+        return json.load(f)['key']
+
+
+class Ticket:
+    """Handle returned by submit(); shared by every caller of the same request"""
+
+    def __init__(self, url, params, priority):
+        self.url = url
+        self.params = dict(params or {})
+        self.priority = priority
+        self.callers = 1
+        self.future = Future()
+
+    @property
+    def key(self):
+        return request_key(self.url, self.params)
+
+    def done(self):
+        return self.future.done()
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+    def __repr__(self):
+        return f"Ticket({self.url}, {self.params}, priority={priority_names.get(self.priority, self.priority)})"
+
+
+class UsageLedger:
+    """Per-day call counts kept in a small SQLite database"""
+
+    def __init__(self, path=LEDGER_PATH):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS api_usage (
+                    day TEXT NOT NULL,
+                    endpoint TEXT NOT NULL,
+                    calls INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (day, endpoint)
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS api_remaining (
+                    day TEXT PRIMARY KEY,
+                    remaining INTEGER NOT NULL
+                )
+            ''')
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def used(self, day=None):
+        day = day or date.today().isoformat()
+        with self._connect() as conn:
+            row = conn.execute('SELECT COALESCE(SUM(calls), 0) FROM api_usage WHERE day = ?', (day,)).fetchone()
+        return row[0]
+
+    def reported_remaining(self, day=None):
+        """Remaining quota as last reported by api-sports, if we have seen it today"""
+        day = day or date.today().isoformat()
+        with self._connect() as conn:
+            row = conn.execute('SELECT remaining FROM api_remaining WHERE day = ?', (day,)).fetchone()
+        return row[0] if row else None
+
+    def record(self, endpoint, remaining=None, day=None):
+        day = day or date.today().isoformat()
+        with self._connect() as conn:
+            conn.execute('''
+                INSERT INTO api_usage (day, endpoint, calls) VALUES (?, ?, 1)
+                ON CONFLICT(day, endpoint) DO UPDATE SET calls = calls + 1
+            ''', (day, endpoint))
+            if remaining is not None:
+                conn.execute('INSERT OR REPLACE INTO api_remaining (day, remaining) VALUES (?, ?)',
+                             (day, remaining))
+
+    def summary(self, day=None):
+        day = day or date.today().isoformat()
+        with self._connect() as conn:
+            rows = conn.execute('SELECT endpoint, calls FROM api_usage WHERE day = ? ORDER BY calls DESC',
+                                (day,)).fetchall()
+        return dict(rows)
+
+
+class RequestScheduler:
+    """Coalesces, prioritizes and budgets api-sports requests"""
+
+    def __init__(self, daily_limit=DAILY_LIMIT, ledger=None, key=None, dry_run=False, session=None):
+        self.daily_limit = daily_limit
+        self.ledger = ledger or UsageLedger()
+        self.dry_run = dry_run
+        self._key = key
+        self._session = session
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._in_flight = {}
+        self._completed = {}
+        self.deferred = []
+        self.coalesced = 0
+
+    @property
+    def key(self):
+        if self._key is None:
+            self._key = load_key()
+        return self._key
+
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = requests.Session()
+        return self._session
+
+    def remaining(self):
+        """Calls left today, preferring the count api-sports reported last"""
+        from_ledger = self.daily_limit - self.ledger.used()
+        reported = self.ledger.reported_remaining()
+        if reported is None:
+            return max(from_ledger, 0)
+        return max(min(from_ledger, reported), 0)
+
+    def submit(self, url, params=None, priority=ROSTER_REFRESH):
+        """Queue a request; identical requests share one Ticket"""
+        key = request_key(url, params)
+        with self._lock:
+            for table in (self._completed, self._in_flight, self._pending):
+                if key in table:
+                    ticket = table[key]
+                    ticket.callers += 1
+                    ticket.priority = min(ticket.priority, priority)
+                    self.coalesced += 1
+                    return ticket
+            ticket = Ticket(url, params, priority)
+            self._pending[key] = ticket
+            return ticket
+
+    def fetch(self, url, params=None, priority=LIVE_STATS):
+        """Submit and run a single request right away, returning its JSON"""
+        ticket = self.submit(url, params, priority)
+        if self.dry_run:
+            print(f"[dry run] would request {url} {params or {}}")
+            return None
+        if not ticket.done() and ticket.key in self._pending:
+            self._run_tickets([ticket])
+        return ticket.result()
+
+    def plan(self):
+        """Work out what run() would send and what it would defer"""
+        with self._lock:
+            queued = sorted(self._pending.values(), key=lambda t: t.priority)
+        remaining = self.remaining()
+        planned, deferred = [], []
+        for ticket in queued:
+            if remaining - priority_reserve.get(ticket.priority, 0) >= 1:
+                planned.append(ticket)
+                remaining -= 1
+            else:
+                deferred.append(ticket)
+        return planned, deferred
+
+    def report(self):
+        planned, deferred = self.plan()
+        by_priority = {}
+        for ticket in planned:
+            name = priority_names.get(ticket.priority, ticket.priority)
+            by_priority[name] = by_priority.get(name, 0) + 1
+        return {
+            'day': date.today().isoformat(),
+            'used_today': self.ledger.used(),
+            'remaining_today': self.remaining(),
+            'planned_calls': len(planned),
+            'planned_by_priority': by_priority,
+            'deferred_calls': len(deferred),
+            'coalesced_requests': self.coalesced,
+        }
+
+    def run(self):
+        """Send every queued request that fits in today's budget, most important first"""
+        planned, deferred = self.plan()
+        if self.dry_run:
+            report = self.report()
+            print(f"[dry run] {report['planned_calls']} calls planned "
+                  f"({report['remaining_today']} left today), "
+                  f"{report['deferred_calls']} deferred, {report['coalesced_requests']} coalesced")
+            for name, count in report['planned_by_priority'].items():
+                print(f"  {name}: {count}")
+            return report
+        for ticket in deferred:
+            self._defer(ticket)
+        self._run_tickets(planned)
+
+        # tickets can still be deferred at send time if another process spent the budget
+        sent = [t for t in planned if not isinstance(t.future.exception(), DeferredRequest)]
+        deferred = deferred + [t for t in planned if t not in sent]
+        sent_by_priority = {}
+        for ticket in sent:
+            name = priority_names.get(ticket.priority, ticket.priority)
+            sent_by_priority[name] = sent_by_priority.get(name, 0) + 1
+        return {
+            'day': date.today().isoformat(),
+            'used_today': self.ledger.used(),
+            'remaining_today': self.remaining(),
+            'sent_calls': len(sent),
+            'sent_by_priority': sent_by_priority,
+            'deferred_calls': len(deferred),
+            'coalesced_requests': self.coalesced,
+        }
+
+    def _defer(self, ticket):
+        with self._lock:
+            self._pending.pop(ticket.key, None)
+            self._in_flight.pop(ticket.key, None)
+        self.deferred.append(ticket)
+        ticket.future.set_exception(DeferredRequest(
+            f"{ticket.url} {ticket.params} deferred: {self.remaining()} calls left today"))
+
+    def _run_tickets(self, tickets):
+        for ticket in tickets:
+            with self._lock:
+                if self._pending.pop(ticket.key, None) is None:
+                    continue
+                self._in_flight[ticket.key] = ticket
+            # the budget may have been spent by another process since plan()
+            if self.remaining() - priority_reserve.get(ticket.priority, 0) < 1:
+                self._defer(ticket)
+                continue
+            try:
+                ticket.future.set_result(self._send(ticket))
+            except Exception as e:
+                ticket.future.set_exception(e)
+            with self._lock:
+                self._in_flight.pop(ticket.key, None)
+                if ticket.future.exception() is None:
+                    self._completed[ticket.key] = ticket
+
+    def _send(self, ticket):
+        headers = {
+            'x-rapidapi-key': self.key,
+            'x-rapidapi-host': API_HOST
+        }
+        response = self.session.get(ticket.url, params=ticket.params, headers=headers)
+        remaining = response.headers.get('x-ratelimit-requests-remaining')
+        self.ledger.record(ticket.url.rstrip('/').rsplit('/', 1)[-1],
+                           int(remaining) if remaining is not None and remaining.isdigit() else None)
+        return response.json()
+
+
+_default_scheduler = None
+
+
+def default_scheduler():
+    """Scheduler shared by every script in this process"""
+    global _default_scheduler
+    if _default_scheduler is None:
+        _default_scheduler = RequestScheduler(dry_run=os.getenv('API_SPORTS_DRY_RUN') == '1')
+    return _default_scheduler
+
+
+if __name__ == "__main__":
+    ledger = UsageLedger()
+    print(f"api-sports usage for {date.today().isoformat()}: {ledger.used()}/{DAILY_LIMIT}")
+    for endpoint, calls in ledger.summary().items():
+        print(f"  {endpoint}: {calls}")
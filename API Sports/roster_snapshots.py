@@ -0,0 +1,231 @@
+"""
+Content-addressed history of NFL roster pulls.
+
+Each player record (name, team, group, position) is hashed and stored once in
+player_records.  A snapshot only stores the players whose record hash changed
+since the previous snapshot, so an unchanged player costs nothing.  The diff
+between two snapshots only looks at players touched in between:
+
+    store = RosterSnapshots()
+    new_id = store.save(all_nfl_players, label="Week5")
+    for change in store.diff(new_id - 1, new_id):
+        print(change['kinds'], change['name'])
+
+Change kinds: signed, released, team_change, group_change (e.g. to Practice
+Squad or Injured Reserve Or O) and updated for anything else.
+
+    python roster_snapshots.py list
+    python roster_snapshots.py diff Week4 Week5
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+from datetime import datetime
+
+
+SNAPSHOT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'roster_snapshots.db')
+RECORD_FIELDS = ('name', 'team', 'team_abbrev', 'group', 'position')
+INACTIVE_GROUPS = ('Practice Squad', 'Injured Reserve Or O')
+
+
+def player_record(player_name, player_data):
+    """Normalized record for one entry of the All_players.json list"""
+    record = {'name': player_name}
+    record.update({field: player_data.get(field) for field in RECORD_FIELDS if field != 'name'})
+    return record
+
+
+def preferred(record):
+    """Sort key for a player listed more than once: active roster first, then by team name"""
+    return record['group'] in INACTIVE_GROUPS, record['team'] or '', record['group'] or ''
+
+
+def record_hash(record):
+    return hashlib.sha1(json.dumps(record, sort_keys=True).encode()).hexdigest()
+
+
+def classify(before, after):
+    if before is None:
+        return ['signed']
+    if after is None:
+        return ['released']
+    kinds = []
+    if before['team'] != after['team']:
+        kinds.append('team_change')
+    if before['group'] != after['group']:
+        kinds.append('group_change')
+    return kinds or ['updated']
+
+
+class RosterSnapshots:
+    """Snapshot store kept in a small SQLite database next to the roster files"""
+
+    def __init__(self, path=SNAPSHOT_DB):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS player_records (
+                hash TEXT PRIMARY KEY,
+                player_id INTEGER NOT NULL,
+                record TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS snapshots (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                label TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                players INTEGER NOT NULL,
+                changes INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS snapshot_changes (
+                snapshot_id INTEGER NOT NULL,
+                player_id INTEGER NOT NULL,
+                hash TEXT,
+                PRIMARY KEY (player_id, snapshot_id),
+                FOREIGN KEY (snapshot_id) REFERENCES snapshots(id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_snapshot_changes_snapshot ON snapshot_changes(snapshot_id);
+            CREATE TABLE IF NOT EXISTS current_roster (
+                player_id INTEGER PRIMARY KEY,
+                hash TEXT NOT NULL
+            );
+        ''')
+
+    def close(self):
+        self.conn.close()
+
+    def save(self, all_nfl_players, label=None):
+        """Store a roster pull in the All_players.json format; returns the snapshot id.
+
+        A pull identical to the latest snapshot does not create a new one.  A player
+        listed on more than one team keeps the entry that sorts first by `preferred`,
+        so the result does not depend on the order of the pull.
+        """
+        listed = {}
+        for player in all_nfl_players:
+            for player_name, player_data in player.items():
+                listed.setdefault(int(player_data['id']), []).append(player_record(player_name, player_data))
+        records = {player_id: min(entries, key=preferred) for player_id, entries in listed.items()}
+        for player_id, entries in sorted(listed.items()):
+            if len(entries) > 1:
+                teams = ', '.join(sorted(entry['team'] or '?' for entry in entries))
+                print(f"Warning: player {player_id} ({records[player_id]['name']}) is listed on {teams}; "
+                      f"keeping {records[player_id]['team']}")
+        hashes = {player_id: record_hash(record) for player_id, record in records.items()}
+
+        current = dict(self.conn.execute('SELECT player_id, hash FROM current_roster'))
+        changed = {pid: h for pid, h in hashes.items() if current.get(pid) != h}
+        removed = [pid for pid in current if pid not in hashes]
+        latest = self.latest()
+        if latest is not None and not changed and not removed:
+            return latest
+
+        with self.conn:
+            cursor = self.conn.execute(
+                'INSERT INTO snapshots (label, created_at, players, changes) VALUES (?, ?, ?, ?)',
+                (label, datetime.now().isoformat(timespec='seconds'), len(hashes), len(changed) + len(removed)))
+            snapshot_id = cursor.lastrowid
+            self.conn.executemany('INSERT OR IGNORE INTO player_records (hash, player_id, record) VALUES (?, ?, ?)',
+                                  [(h, pid, json.dumps(records[pid], sort_keys=True)) for pid, h in changed.items()])
+            self.conn.executemany('INSERT INTO snapshot_changes (snapshot_id, player_id, hash) VALUES (?, ?, ?)',
+                                  [(snapshot_id, pid, h) for pid, h in changed.items()] +
+                                  [(snapshot_id, pid, None) for pid in removed])
+            self.conn.executemany('INSERT OR REPLACE INTO current_roster (player_id, hash) VALUES (?, ?)',
+                                  changed.items())
+            self.conn.executemany('DELETE FROM current_roster WHERE player_id = ?', [(pid,) for pid in removed])
+        return snapshot_id
+
+    def latest(self):
+        row = self.conn.execute('SELECT MAX(id) FROM snapshots').fetchone()
+        return row[0]
+
+    def resolve(self, snapshot):
+        """Snapshot id from an id or a label (the newest snapshot with that label)"""
+        if isinstance(snapshot, int) or str(snapshot).isdigit():
+            return int(snapshot)
+        row = self.conn.execute('SELECT MAX(id) FROM snapshots WHERE label = ?', (snapshot,)).fetchone()
+        if row[0] is None:
+            raise KeyError(f"No roster snapshot labelled {snapshot}")
+        return row[0]
+
+    def snapshots(self):
+        return self.conn.execute('SELECT id, label, created_at, players, changes FROM snapshots ORDER BY id').fetchall()
+
+    def _records(self, hashes):
+        hashes = [h for h in hashes if h]
+        if not hashes:
+            return {}
+        placeholders = ', '.join('?' for _ in hashes)
+        rows = self.conn.execute(f'SELECT hash, record FROM player_records WHERE hash IN ({placeholders})', hashes)
+        return {h: json.loads(record) for h, record in rows}
+
+    def diff(self, old, new):
+        """Changes between two snapshots, touching only players that changed in between"""
+        old, new = self.resolve(old), self.resolve(new)
+        reverse = old > new
+        if reverse:
+            old, new = new, old
+        rows = self.conn.execute('''
+            WITH touched AS (
+                SELECT DISTINCT player_id FROM snapshot_changes WHERE snapshot_id > ? AND snapshot_id <= ?
+            )
+            SELECT t.player_id,
+                   (SELECT hash FROM snapshot_changes c WHERE c.player_id = t.player_id AND c.snapshot_id <= ?
+                    ORDER BY c.snapshot_id DESC LIMIT 1),
+                   (SELECT hash FROM snapshot_changes c WHERE c.player_id = t.player_id AND c.snapshot_id <= ?
+                    ORDER BY c.snapshot_id DESC LIMIT 1)
+            FROM touched t
+        ''', (old, new, old, new)).fetchall()
+        if reverse:
+            rows = [(pid, after, before) for pid, before, after in rows]
+
+        records = self._records([h for row in rows for h in row[1:]])
+        changes = []
+        for player_id, before_hash, after_hash in rows:
+            if before_hash == after_hash:
+                continue
+            before, after = records.get(before_hash), records.get(after_hash)
+            changes.append({
+                'player_id': player_id,
+                'name': (after or before)['name'],
+                'kinds': classify(before, after),
+                'before': before,
+                'after': after,
+            })
+        return sorted(changes, key=lambda c: (c['kinds'], c['name']))
+
+    def changes_since(self, snapshot):
+        """Feed for waiver and injury features: everything that changed after `snapshot`"""
+        latest = self.latest()
+        if latest is None:
+            return []
+        return self.diff(snapshot, latest)
+
+
+def print_changes(changes):
+    for change in changes:
+        before, after = change['before'] or {}, change['after'] or {}
+        detail = ''
+        if 'team_change' in change['kinds']:
+            detail += f" {before['team']} -> {after['team']}"
+        if 'group_change' in change['kinds']:
+            detail += f" [{before['group']} -> {after['group']}]"
+        if change['kinds'] == ['signed']:
+            detail = f" {after['team']} ({after['group']})"
+        if change['kinds'] == ['released']:
+            detail = f" {before['team']}"
+        print(f"{', '.join(change['kinds']):<28}{change['name']}{detail}")
+
+
+if __name__ == "__main__":
+    store = RosterSnapshots()
+    command = sys.argv[1] if len(sys.argv) > 1 else 'list'
+    if command == 'diff' and len(sys.argv) == 4:
+        changes = store.diff(sys.argv[2], sys.argv[3])
+        print_changes(changes)
+        print(f"{len(changes)} changes")
+    else:
+        for snapshot_id, label, created_at, players, changes in store.snapshots():
+            print(f"{snapshot_id:>4}  {label or '':<20}{created_at}  {players} players, {changes} changed")
+    store.close()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Snapshot the stats and league databases into columnar .npy files for analysis.
+
+Analysis scripts should read these files, not the live SQLite databases the site
+uses.  Each table is split into one directory per week.  Each column is stored as
+a typed .npy file that can be memory-mapped, and manifest.json describes
+everything.  Each column has one kind (text, int or float) for the whole table;
+string width, and float for an int column holding NULLs, are set per week and
+recorded with that week:
+
+    columnar/
+      manifest.json
+      player_stats/week_1/pass_yards.npy
+      Points/static/player_ID.npy, Points/week_1/points.npy, ...
+
+The sources are opened read-only.  A week is only rewritten when its rows have
+changed since the last export, so re-running after a week is finalized only
+touches that week.
+
+    python export_columnar.py                 # every week, skipping unchanged ones
+    python export_columnar.py --week 5
+
+    from export_columnar import load_columns
+    cols = load_columns('player_stats', ['player_id', 'rush_yards'], week=5)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+
+EXPORT_DIR = 'columnar'
+MANIFEST = 'manifest.json'
+STATS_DB = os.path.join('API Sports', 'nfl_stats.db')
+LEAGUE_DB = 'PFL-2025.db'
+
+# table -> (source database, row order); week-partitioned on their "week" column
+LONG_TABLES = {
+    'player_stats': (STATS_DB, 'id'),
+    'point_subtotals': (STATS_DB, 'id'),
+    'games': (STATS_DB, 'id'),
+    'WeeklyResults': (LEAGUE_DB, 'owner_ID'),
+}
+
+# tables with one week_N column per week: the other columns go to "static" and
+# each week column becomes week_N/points.npy aligned with it
+WIDE_TABLES = {
+    'Points': (STATS_DB, 'player_ID'),
+}
+
+
+def connect_readonly(path):
+    return sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+
+
+def week_number(value):
+    """Week values are stored both as 5 and as 'Week 5'"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.search(r'\d+', str(value or ''))
+    return int(match.group()) if match else None
+
+
+def affinity(declared):
+    """SQLite column affinity of a declared type"""
+    declared = (declared or '').upper()
+    if 'INT' in declared:
+        return 'integer'
+    if any(name in declared for name in ('CHAR', 'CLOB', 'TEXT')):
+        return 'text'
+    if any(name in declared for name in ('REAL', 'FLOA', 'DOUB')):
+        return 'real'
+    return 'numeric'
+
+
+def scan_columns(conn, table):
+    """Declared affinity of every column plus whether text or real values are stored anywhere"""
+    info = [(row[1], affinity(row[2])) for row in conn.execute(f'PRAGMA table_info("{table}")')]
+    checks = []
+    for column, _ in info:
+        checks += [f"MAX(typeof(\"{column}\") IN ('text', 'blob'))", f"MAX(typeof(\"{column}\") = 'real')"]
+    stats = conn.execute(f'SELECT {", ".join(checks)} FROM "{table}"').fetchone()
+    return {column: {'affinity': kind, 'text': bool(stats[2 * i]), 'real': bool(stats[2 * i + 1])}
+            for i, (column, kind) in enumerate(info)}
+
+
+def column_kind(scans):
+    """text, int or float for a column (or several stored as one array, like the week_N columns).
+
+    SQLite types are loose, e.g. games.week is declared INTEGER but holds 'Week 1'.
+    """
+    affinities = {scan['affinity'] for scan in scans}
+    if any(scan['text'] for scan in scans) or 'text' in affinities:
+        return 'text'
+    if any(scan['real'] for scan in scans) or 'real' in affinities:
+        return 'float'
+    return 'int'
+
+
+def to_array(values, kind):
+    """Array of one partition's values; width and NULL handling only depend on this partition"""
+    if kind == 'text':
+        text = ['' if v is None else str(v) for v in values]
+        return np.array(text, dtype=f'U{max([1] + [len(v) for v in text])}')
+    if kind == 'int' and None not in values:
+        return np.array(values, dtype=np.int64)
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def fingerprint(columns, rows):
+    digest = hashlib.sha1(json.dumps(columns).encode())
+    for row in rows:
+        digest.update(repr(row).encode())
+    return digest.hexdigest()
+
+
+def write_partition(table_dir, name, columns, rows, kinds):
+    """Write one partition's columns to a temp dir, then swap it into place"""
+    final = os.path.join(table_dir, name)
+    tmp = final + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    dtypes = {}
+    for i, column in enumerate(columns):
+        array = to_array([row[i] for row in rows], kinds[column])
+        np.save(os.path.join(tmp, f'{column}.npy'), array)
+        dtypes[column] = array.dtype.str
+    shutil.rmtree(final, ignore_errors=True)
+    os.replace(tmp, final)
+    return dtypes
+
+
+def set_kinds(entry, kinds):
+    """Record the table's column kinds; True when one changed and every partition must be rewritten"""
+    changed = entry.get('kinds') != kinds
+    entry['kinds'] = kinds
+    entry.pop('dtypes', None)
+    return changed
+
+
+def export_long_table(conn, table, order_by, entry, weeks, force):
+    scans = scan_columns(conn, table)
+    columns = list(scans)
+    kinds = {column: column_kind([scan]) for column, scan in scans.items()}
+    retyped = set_kinds(entry, kinds)
+    table_dir = os.path.join(EXPORT_DIR, table)
+    os.makedirs(table_dir, exist_ok=True)
+
+    raw_weeks = {}
+    for (value,) in conn.execute(f'SELECT DISTINCT week FROM "{table}"'):
+        week = week_number(value)
+        if week is not None:
+            raw_weeks.setdefault(week, []).append(value)
+
+    written = []
+    for week in sorted(raw_weeks):
+        if weeks and week not in weeks and not retyped:
+            continue
+        values = raw_weeks[week]
+        placeholders = ', '.join('?' for _ in values)
+        rows = conn.execute(f'SELECT * FROM "{table}" WHERE week IN ({placeholders}) ORDER BY "{order_by}"',
+                            values).fetchall()
+        name = f'week_{week}'
+        key = fingerprint(columns, rows)
+        previous = entry['partitions'].get(name)
+        if not force and not retyped and previous and previous['fingerprint'] == key \
+                and os.path.isdir(os.path.join(table_dir, name)):
+            continue
+        dtypes = write_partition(table_dir, name, columns, rows, kinds)
+        entry['partitions'][name] = {'week': week, 'rows': len(rows), 'fingerprint': key, 'dtypes': dtypes}
+        written.append(name)
+    entry['columns'] = columns
+    return written
+
+
+def export_wide_table(conn, table, order_by, entry, weeks, force):
+    scans = scan_columns(conn, table)
+    week_cols = {int(c.split('_')[1]): c for c in scans if re.fullmatch(r'week_\d+', c)}
+    static_cols = [c for c in scans if c not in week_cols.values()]
+    kinds = {column: column_kind([scans[column]]) for column in static_cols}
+    kinds['points'] = column_kind([scans[column] for column in week_cols.values()])
+    retyped = set_kinds(entry, kinds)
+    table_dir = os.path.join(EXPORT_DIR, table)
+    os.makedirs(table_dir, exist_ok=True)
+
+    written = []
+    quoted = ', '.join(f'"{c}"' for c in static_cols)
+    static_rows = conn.execute(f'SELECT {quoted} FROM "{table}" ORDER BY "{order_by}"').fetchall()
+    # week files are aligned with the static rows, so only the key order matters here
+    key_index = static_cols.index(order_by)
+    static_key = fingerprint([order_by], [row[key_index] for row in static_rows])
+    previous = entry['partitions'].get('static')
+    realigned = not previous or previous.get('order') != static_key
+    if force or retyped or realigned or previous['fingerprint'] != fingerprint(static_cols, static_rows):
+        dtypes = write_partition(table_dir, 'static', static_cols, static_rows, kinds)
+        entry['partitions']['static'] = {'rows': len(static_rows), 'order': static_key,
+                                         'fingerprint': fingerprint(static_cols, static_rows), 'dtypes': dtypes}
+        written.append('static')
+
+    for week, column in sorted(week_cols.items()):
+        if weeks and week not in weeks and not realigned and not retyped:
+            continue
+        rows = conn.execute(f'SELECT "{column}" FROM "{table}" ORDER BY "{order_by}"').fetchall()
+        name = f'week_{week}'
+        key = fingerprint([column], rows)
+        previous = entry['partitions'].get(name)
+        if not force and not retyped and not realigned and previous and previous['fingerprint'] == key:
+            continue
+        dtypes = write_partition(table_dir, name, ['points'], rows, kinds)
+        entry['partitions'][name] = {'week': week, 'rows': len(rows), 'fingerprint': key, 'dtypes': dtypes}
+        written.append(name)
+    entry['columns'] = static_cols + ['points']
+    return written
+
+
+def read_manifest():
+    path = os.path.join(EXPORT_DIR, MANIFEST)
+    if os.path.exists(path):
+        with open(path, 'r') as file:
+            return json.load(file)
+    return {'tables': {}}
+
+
+def write_manifest(manifest):
+    path = os.path.join(EXPORT_DIR, MANIFEST)
+    with open(path + '.tmp', 'w') as file:
+        json.dump(manifest, file, indent=2)
+    os.replace(path + '.tmp', path)
+
+
+def export(weeks=None, force=False):
+    """Export every table, returning {table: [partitions written]}"""
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    manifest = read_manifest()
+    written = {}
+    tables = [(t, src, order, 'long', export_long_table) for t, (src, order) in LONG_TABLES.items()] + \
+             [(t, src, order, 'wide', export_wide_table) for t, (src, order) in WIDE_TABLES.items()]
+    for table, source, order_by, layout, exporter in tables:
+        entry = manifest['tables'].setdefault(table, {'source': source, 'layout': layout, 'partitions': {}})
+        conn = connect_readonly(source)
+        try:
+            written[table] = exporter(conn, table, order_by, entry, weeks, force)
+        finally:
+            conn.close()
+    manifest['exported_at'] = datetime.now().isoformat(timespec='seconds')
+    write_manifest(manifest)
+    return written
+
+
+def load_columns(table, columns, week=None, partition=None):
+    """Memory-map the requested columns of one week (or 'static') without copying"""
+    name = partition or f'week_{week}'
+    return {column: np.load(os.path.join(EXPORT_DIR, table, name, f'{column}.npy'), mmap_mode='r')
+            for column in columns}
+
+
+def load_season(table, columns, weeks=None):
+    """Columns across several weeks, concatenated (this one does copy).
+
+    Weeks can differ in string width, or be float where an int column has NULLs;
+    np.concatenate promotes them to a common dtype.
+    """
+    manifest = read_manifest()
+    partitions = manifest['tables'][table]['partitions']
+    names = sorted((p for p in partitions if p.startswith('week_')), key=lambda p: partitions[p]['week'])
+    names = [p for p in names if not weeks or partitions[p]['week'] in weeks]
+    parts = [load_columns(table, columns, partition=p) for p in names]
+    return {column: np.concatenate([part[column] for part in parts]) if parts else np.array([])
+            for column in columns}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--week', type=int, action='append', help="only export this week (repeatable)")
+    parser.add_argument('--force', action='store_true', help="rewrite partitions even if unchanged")
+    args = parser.parse_args()
+
+    written = export(args.week, args.force)
+    for table, partitions in written.items():
+        print(f"{table}: {', '.join(partitions) if partitions else 'up to date'}")
+    print(f"Manifest written to {os.path.join(EXPORT_DIR, MANIFEST)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Best possible lineup for every owner and week, and how far the real lineup fell short.
+
+The lineup is QB, RB_1, WR_1, FLEX_1, FLEX_2, TE, K, DEF, where FLEX takes an RB or
+WR and fullbacks count as RBs (rule 5.4).  Players whose NFL team is on bye
+(NFL_Teams.bye) are not eligible that week, and weeks with no points data at all
+report no optimum or gap.  All owners and weeks are solved together: rosters are
+laid out as [owner, player, week] arrays per position group and each group is
+solved by sorting, so no lineup combinations are enumerated.
+
+The RB/WR group is the only real assignment problem.  Some optimal lineup always
+uses the best eligible RB in RB_1 and the best WR in WR_1, so the two FLEX spots are
+the best two of what is left (the next two RBs and next two WRs).
+
+    python optimal_lineups.py                       # Points week_1..week_18
+    python optimal_lineups.py --projections proj.json --output gaps.json
+"""
+
+import argparse
+import json
+import sqlite3
+
+import numpy as np
+
+DB_PATH = 'PFL-2025.db'
+WEEKS = 18
+FREE_AGENT_ID = '99'
+LINEUP_SLOTS = ['QB', 'RB_1', 'WR_1', 'FLEX_1', 'FLEX_2', 'TE', 'K', 'DEF']
+
+# lineup slot -> Players.position for the single-player slots
+SINGLE_SLOTS = {'QB': 'QB', 'TE': 'TE', 'K': 'PK', 'DEF': 'D/ST'}
+
+
+def load_rosters(conn):
+    """Rostered players with their owner and bye week; fullbacks are listed as RB"""
+    rows = conn.execute('''
+        SELECT p.player_ID, CASE WHEN p.position = 'FB' THEN 'RB' ELSE p.position END, p.owner_ID, t.bye
+        FROM Players p
+        LEFT JOIN NFL_Teams t ON t.team_ID = p.team_id
+        WHERE p.owner_ID != ? AND p.position IN ('QB', 'RB', 'FB', 'WR', 'TE', 'PK', 'D/ST')
+        ORDER BY p.owner_ID, p.player_ID
+    ''', (FREE_AGENT_ID,)).fetchall()
+    return rows
+
+
+def load_points(conn, player_ids):
+    """Points week_1..week_18 as a [player, week] array, NaN where there is no data"""
+    week_cols = ', '.join(f'week_{w}' for w in range(1, WEEKS + 1))
+    points = {row[0]: row[1:] for row in conn.execute(f'SELECT player_ID, {week_cols} FROM Points')}
+    return np.array([[np.nan if v is None else v for v in points.get(pid, (None,) * WEEKS)]
+                     for pid in player_ids], dtype=float)
+
+
+def load_projections(path, player_ids):
+    """Projections file: {"<player_ID>": {"<week>": points}}"""
+    with open(path, 'r') as file:
+        projections = json.load(file)
+    values = np.full((len(player_ids), WEEKS), np.nan)
+    for i, pid in enumerate(player_ids):
+        for week, points in projections.get(str(pid), {}).items():
+            if 1 <= int(week) <= WEEKS:
+                values[i, int(week) - 1] = points
+    return values
+
+
+def group_tensor(owner_index, positions, values, ids, group, n_owners):
+    """Players of one position group as [owner, slot, week] values, -inf where empty"""
+    members = np.nonzero(positions == group)[0]
+    owners = owner_index[members]
+    # position of each player within its owner's group
+    order = np.argsort(owners, kind='stable')
+    owners, members = owners[order], members[order]
+    starts = np.searchsorted(owners, np.arange(n_owners))
+    rank = np.arange(len(members)) - starts[owners]
+    depth = max(int(rank.max()) + 1 if len(members) else 1, 3)
+
+    tensor = np.full((n_owners, depth, values.shape[1]), -np.inf)
+    tensor[owners, rank] = values[members]
+    player = np.zeros((n_owners, depth), dtype=np.int64)
+    player[owners, rank] = ids[members]
+    return tensor, player
+
+
+def top_k(tensor, player, k):
+    """Best k players per owner and week: (values [o, k, w], player ids [o, k, w])"""
+    order = np.argsort(-tensor, axis=1, kind='stable')[:, :k]
+    values = np.take_along_axis(tensor, order, axis=1)
+    ids = np.take_along_axis(np.broadcast_to(player[:, :, None], tensor.shape), order, axis=1)
+    return values, np.where(np.isfinite(values), ids, 0)
+
+
+def solve(owners, rows, values):
+    """Optimal lineup points and players for every owner and week.
+
+    Returns (points [owner, week], {slot: player ids [owner, week]}).
+    """
+    player_ids = np.array([row[0] for row in rows], dtype=np.int64)
+    positions = np.array([row[1] for row in rows])
+    index = {owner: i for i, owner in enumerate(owners)}
+    owner_index = np.array([index[row[2]] for row in rows], dtype=np.int64)
+    byes = np.array([row[3] or 0 for row in rows])
+
+    weeks = np.arange(1, values.shape[1] + 1)
+    eligible = byes[:, None] != weeks[None, :]
+    values = np.where(eligible, values, -np.inf)
+
+    n = len(owners)
+    lineup, total = {}, np.zeros((n, values.shape[1]))
+
+    for slot, position in SINGLE_SLOTS.items():
+        tensor, player = group_tensor(owner_index, positions, values, player_ids, position, n)
+        best, ids = top_k(tensor, player, 1)
+        lineup[slot] = ids[:, 0]
+        total += np.where(np.isfinite(best[:, 0]), best[:, 0], 0)
+
+    rb, rb_ids = top_k(*group_tensor(owner_index, positions, values, player_ids, 'RB', n), 3)
+    wr, wr_ids = top_k(*group_tensor(owner_index, positions, values, player_ids, 'WR', n), 3)
+    lineup['RB_1'], lineup['WR_1'] = rb_ids[:, 0], wr_ids[:, 0]
+
+    flex_pool = np.concatenate([rb[:, 1:], wr[:, 1:]], axis=1)
+    flex_pool_ids = np.concatenate([rb_ids[:, 1:], wr_ids[:, 1:]], axis=1)
+    order = np.argsort(-flex_pool, axis=1, kind='stable')[:, :2]
+    flex = np.take_along_axis(flex_pool, order, axis=1)
+    flex_ids = np.take_along_axis(flex_pool_ids, order, axis=1)
+    lineup['FLEX_1'], lineup['FLEX_2'] = flex_ids[:, 0], flex_ids[:, 1]
+
+    for part in (rb[:, 0], wr[:, 0], flex[:, 0], flex[:, 1]):
+        total += np.where(np.isfinite(part), part, 0)
+    return total, lineup
+
+
+def actual_points(conn, owners, player_points, player_ids):
+    """Scores that were actually recorded: WeeklyResults, else the submitted Lineups"""
+    index = {owner: i for i, owner in enumerate(owners)}
+    actual = np.full((len(owners), WEEKS), np.nan)
+
+    row_of = {pid: i for i, pid in enumerate(player_ids)}
+    slot_cols = ', '.join(LINEUP_SLOTS)
+    for row in conn.execute(f'SELECT owner_ID, week, {slot_cols} FROM Lineups'):
+        owner, week = row[0], int(row[1])
+        if owner in index and 1 <= week <= WEEKS:
+            actual[index[owner], week - 1] = sum(
+                np.nan_to_num(player_points[row_of[int(pid)], week - 1])
+                for pid in row[2:] if pid and str(pid).isdigit() and int(pid) in row_of)
+
+    for week, owner, points in conn.execute('SELECT week, owner_ID, points FROM WeeklyResults'):
+        if owner in index and 1 <= week <= WEEKS:
+            actual[index[owner], week - 1] = points
+    return actual
+
+
+def optimal_lineups(conn, projections=None):
+    """Optimal lineup, optimal points, actual points and gap per owner and week"""
+    rows = load_rosters(conn)
+    owners = sorted({row[2] for row in rows})
+    player_ids = [row[0] for row in rows]
+    points = load_points(conn, player_ids)
+    values = load_projections(projections, player_ids) if projections else points
+    # weeks without any points data have no meaningful optimum
+    has_data = ~np.isnan(values).all(axis=0)
+
+    optimal, lineup = solve(owners, rows, np.nan_to_num(values))
+    actual = actual_points(conn, owners, points, player_ids)
+
+    results = {}
+    for i, owner in enumerate(owners):
+        results[owner] = {}
+        for w in range(WEEKS):
+            has_actual = not np.isnan(actual[i, w])
+            results[owner][w + 1] = {
+                'optimal': float(optimal[i, w]) if has_data[w] else None,
+                'actual': float(actual[i, w]) if has_actual else None,
+                'gap': float(optimal[i, w] - actual[i, w]) if has_actual and has_data[w] else None,
+                'lineup': {slot: int(lineup[slot][i, w]) or None for slot in LINEUP_SLOTS} if has_data[w] else None,
+            }
+    return results
+
+
+def print_gaps(results):
+    weeks = range(1, WEEKS + 1)
+    print("Optimal minus actual points by week")
+    print("  Team " + ''.join(f'{w:>6}' for w in weeks) + '   Total')
+    for owner, by_week in results.items():
+        gaps = [by_week[w]['gap'] for w in weeks]
+        cells = ''.join(f'{g:>6.0f}' if g is not None else f'{"-":>6}' for g in gaps)
+        print(f"  {owner:<5}{cells}{sum(g for g in gaps if g is not None):>8.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--projections', help="JSON of {player_ID: {week: points}} to use instead of Points")
+    parser.add_argument('--output', help="write the full results to this JSON file")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        results = optimal_lineups(conn, args.projections)
+    finally:
+        conn.close()
+
+    print_gaps(results)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo playoff odds for every FinalStandings slot.
+
+Each owner's remaining weekly scores are drawn from a normal distribution fitted
+to their WeeklyResults history (shrunk toward the league average early in the
+season).  The remaining schedule is played out for many seasons at once with
+NumPy arrays, split across a process pool, and each simulated season is seeded
+the same way FinalStandings is (division champions, wildcards, loser bracket).
+
+Simulated ties on record are broken on points for, then points against (rules
+8.2/8.3 steps 4-5); the head-to-head steps are only applied to the real
+standings by recalculate_standings.py.
+
+    python playoff_odds.py                          # odds as of the last scored week
+    python playoff_odds.py --as-of-week 10 --seasons 1000000
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from recalculate_standings import DB_PATH, REGULAR_SEASON_WEEKS, League, load_league, compute_records
+
+CACHE_DIR = 'PlayoffOdds'
+DEFAULT_SEASONS = 200_000
+BATCH_SIZE = 50_000
+# weeks of league-average scoring blended into each owner's history
+PRIOR_WEEKS = 3
+
+SLOTS = ([f'Division_{i}' for i in range(1, 5)] +
+         [f'Wildcard_{i}' for i in range(1, 5)] +
+         [f'LoserBracket_{i}' for i in range(1, 9)])
+
+
+def fit_scoring(league, played_rows):
+    """Per-owner mean and standard deviation of weekly points, shrunk toward the league"""
+    history = league.scores[played_rows]
+    observed = ~np.isnan(history)
+    counts = observed.sum(axis=0)
+    league_mean = np.nanmean(history) if observed.any() else 100.0
+    league_std = np.nanstd(history) if observed.sum() > 1 else 25.0
+
+    totals = np.where(observed, history, 0.0).sum(axis=0)
+    mean = (totals + PRIOR_WEEKS * league_mean) / (counts + PRIOR_WEEKS)
+    sq = np.where(observed, (history - mean) ** 2, 0.0).sum(axis=0)
+    var = (sq + PRIOR_WEEKS * league_std ** 2) / (counts + PRIOR_WEEKS)
+    return mean.astype(np.float32), np.sqrt(var).astype(np.float32)
+
+
+def seed_batch(composite, divisions):
+    """Vectorized FinalStandings seeding for a batch of seasons.
+
+    composite: [s, n] sortable season score, higher is better.
+    Returns [s, 16] owner index in SLOTS order.
+    """
+    seasons = composite.shape[0]
+    champions = []
+    for division in np.unique(divisions):
+        members = np.nonzero(divisions == division)[0]
+        champions.append(members[np.argmax(composite[:, members], axis=1)])
+    champions = np.stack(champions, axis=1)
+
+    champ_scores = np.take_along_axis(composite, champions, axis=1)
+    champions = np.take_along_axis(champions, np.argsort(-champ_scores, axis=1), axis=1)
+
+    rest = composite.copy()
+    rest[np.arange(seasons)[:, None], champions] = -np.inf
+    rest_order = np.argsort(-rest, axis=1)[:, :composite.shape[1] - champions.shape[1]]
+    return np.concatenate([champions, rest_order], axis=1)
+
+
+def simulate_chunk(seasons, seed, base, mean, std, opponents, divisions):
+    """Play out `seasons` seasons and count how often each owner lands in each slot"""
+    rng = np.random.default_rng(seed)
+    n = len(mean)
+    counts = np.zeros((n, len(SLOTS)), dtype=np.int64)
+    weeks = opponents.shape[0]
+    scheduled = opponents >= 0
+    safe_opp = np.where(scheduled, opponents, 0)
+
+    done = 0
+    while done < seasons:
+        size = min(BATCH_SIZE, seasons - done)
+        points = rng.standard_normal((size, weeks, n), dtype=np.float32) * std + mean
+        opp_points = np.take_along_axis(points, np.broadcast_to(safe_opp, points.shape), axis=2)
+        margin = np.where(scheduled, points - opp_points, 0.0)
+
+        wins = base['wins'] + (margin > 0).sum(axis=1)
+        ties = base['ties'] + ((margin == 0) & scheduled).sum(axis=1)
+        pf = base['pf'] + np.where(scheduled, points, 0.0).sum(axis=1)
+        pa = base['pa'] + np.where(scheduled, opp_points, 0.0).sum(axis=1)
+
+        # record first, then points for, then fewest points against
+        composite = (wins + 0.5 * ties) * 1e6 + pf - pa * 1e-4
+        seeds = seed_batch(composite, divisions)
+        counts += np.bincount((seeds * len(SLOTS) + np.arange(len(SLOTS))).ravel(),
+                              minlength=n * len(SLOTS)).reshape(n, len(SLOTS))
+        done += size
+    return counts
+
+
+def simulate(league, as_of_week, seasons=DEFAULT_SEASONS, workers=None, seed=None):
+    """Playoff odds as an [owner, slot] probability matrix"""
+    played_rows = league.weeks <= as_of_week
+    remaining_rows = ~played_rows
+
+    so_far = compute_records(League(league.owners, league.divisions, league.weeks[played_rows],
+                                    league.scores[played_rows], league.opponents[played_rows]))
+    mean, std = fit_scoring(league, played_rows)
+    opponents = league.opponents[remaining_rows]
+    divisions = league.divisions
+
+    base = {name: so_far[name].astype(float) for name in ('wins', 'ties', 'pf', 'pa')}
+    if not opponents.shape[0]:
+        seasons = 1
+
+    workers = workers or os.cpu_count() or 1
+    chunks = [seasons // workers + (i < seasons % workers) for i in range(workers)]
+    chunks = [c for c in chunks if c]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+
+    run = partial(simulate_chunk, base=base, mean=mean, std=std, opponents=opponents, divisions=divisions)
+    if len(chunks) == 1:
+        counts = run(chunks[0], seeds[0])
+    else:
+        with ProcessPoolExecutor(max_workers=len(chunks)) as pool:
+            counts = sum(pool.map(run, chunks, seeds))
+    return counts / seasons
+
+
+def last_scored_week(league):
+    scored = ~np.isnan(league.scores).all(axis=1)
+    return int(league.weeks[scored].max()) if scored.any() else 0
+
+
+def fingerprint(league, as_of_week, seasons):
+    played = league.weeks <= as_of_week
+    digest = hashlib.sha1()
+    digest.update(np.nan_to_num(league.scores[played], nan=-1).tobytes())
+    digest.update(league.opponents.tobytes())
+    digest.update(f'{seasons}'.encode())
+    return digest.hexdigest()
+
+
+def playoff_odds(conn, as_of_week=None, seasons=DEFAULT_SEASONS, workers=None, use_cache=True):
+    """Odds per owner and slot, cached per week in PlayoffOdds/week_<N>.json"""
+    league = load_league(conn, range(1, REGULAR_SEASON_WEEKS + 1))
+    if as_of_week is None:
+        as_of_week = last_scored_week(league)
+
+    key = fingerprint(league, as_of_week, seasons)
+    cache_path = os.path.join(CACHE_DIR, f'week_{as_of_week}.json')
+    if use_cache and os.path.exists(cache_path):
+        with open(cache_path, 'r') as file:
+            cached = json.load(file)
+        if cached.get('fingerprint') == key:
+            return cached
+
+    probabilities = simulate(league, as_of_week, seasons, workers)
+    result = {
+        'week': as_of_week,
+        'seasons': seasons,
+        'fingerprint': key,
+        'odds': {owner: dict(zip(SLOTS, map(float, probabilities[i])))
+                 for i, owner in enumerate(league.owners)},
+    }
+    if use_cache:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(cache_path, 'w') as file:
+            json.dump(result, file, indent=2)
+    return result
+
+
+def print_odds(result):
+    print(f"Playoff odds after week {result['week']} ({result['seasons']:,} seasons)")
+    print(f"  {'Team':<6}{'Div':>8}{'WC':>8}{'Playoffs':>10}{'B1':>8}")
+    rows = []
+    for owner, odds in result['odds'].items():
+        division = sum(odds[f'Division_{i}'] for i in range(1, 5))
+        wildcard = sum(odds[f'Wildcard_{i}'] for i in range(1, 5))
+        rows.append((division + wildcard, owner, division, wildcard, odds['LoserBracket_1']))
+    for playoffs, owner, division, wildcard, b1 in sorted(rows, reverse=True):
+        print(f"  {owner:<6}{division:>8.1%}{wildcard:>8.1%}{playoffs:>10.1%}{b1:>8.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--as-of-week', type=int, help="treat weeks after this as unplayed")
+    parser.add_argument('--seasons', type=int, default=DEFAULT_SEASONS)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--no-cache', action='store_true')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        result = playoff_odds(conn, args.as_of_week, args.seasons, args.workers, not args.no_cache)
+    finally:
+        conn.close()
+    print_odds(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""
+Rebuild league standings from WeeklyResults and WeeklyMatchups.
+
+Replaces the one-off scripts/recalculate-standings-*.js scripts.  All weeks in the
+requested range are scored in a single NumPy pass, the tiebreakers from the
+league rules (sections 8.1-8.3) are applied, FinalStandings is seeded per
+section 7, and everything is written in one transaction.
+
+    python recalculate_standings.py                  # weeks 1-14
+    python recalculate_standings.py --weeks 1-3
+    python recalculate_standings.py --apply-week 5   # add one finalized week
+"""
+
+import argparse
+import sqlite3
+
+import numpy as np
+
+DB_PATH = 'PFL-2025.db'
+REGULAR_SEASON_WEEKS = 14
+FREE_AGENT_ID = '99'
+
+class League:
+    """Owners, divisions, weekly scores and schedule as aligned arrays"""
+
+    def __init__(self, owners, divisions, weeks, scores, opponents, draft_order=None):
+        self.owners = owners                  # [n] owner_IDs
+        self.divisions = np.asarray(divisions)  # [n] division letter
+        self.weeks = np.asarray(weeks)        # [w] week numbers
+        self.scores = scores                  # [w, n] points, NaN if not scored yet
+        self.opponents = opponents            # [w, n] opponent index, -1 if no game
+        self.index = {owner: i for i, owner in enumerate(owners)}
+        self.draft_order = draft_order        # owner_IDs, first pick first; None if unknown
+
+
+def load_owners(conn):
+    rows = conn.execute('SELECT Team_ID, Division FROM Standings ORDER BY Team_ID').fetchall()
+    if not rows:
+        rows = conn.execute('SELECT owner_ID, NULL FROM Owners WHERE owner_ID != ? ORDER BY owner_ID',
+                            (FREE_AGENT_ID,)).fetchall()
+    owners = [row[0] for row in rows]
+    divisions = [row[1] or row[0][0] for row in rows]
+    return owners, divisions
+
+
+def load_draft_order(conn):
+    """Round 1 of the Draft table, first pick first, or None if there is no draft data"""
+    exists = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='Draft'").fetchone()
+    if not exists:
+        return None
+    order = [row[0] for row in conn.execute('SELECT team_id FROM Draft WHERE round = 1 ORDER BY pick')]
+    return order or None
+
+
+def load_league(conn, weeks=None, draft_order=None):
+    """Read the tables the engine needs into a League for the given weeks"""
+    owners, divisions = load_owners(conn)
+    weeks = list(weeks or range(1, REGULAR_SEASON_WEEKS + 1))
+    index = {owner: i for i, owner in enumerate(owners)}
+    row_of = {week: r for r, week in enumerate(weeks)}
+
+    scores = np.full((len(weeks), len(owners)), np.nan)
+    for week, owner, points in conn.execute('SELECT week, owner_ID, points FROM WeeklyResults'):
+        if week in row_of and owner in index:
+            scores[row_of[week], index[owner]] = points
+
+    opponents = np.full((len(weeks), len(owners)), -1, dtype=np.int64)
+    team_cols = ', '.join(f'Team_{i}' for i in range(1, 17))
+    for row in conn.execute(f'SELECT Week, {team_cols} FROM WeeklyMatchups'):
+        week, teams = row[0], row[1:]
+        if week not in row_of:
+            continue
+        for a, b in zip(teams[0::2], teams[1::2]):
+            if a in index and b in index:
+                opponents[row_of[week], index[a]] = index[b]
+                opponents[row_of[week], index[b]] = index[a]
+
+    # weeks missing from WeeklyMatchups fall back to the per-owner Matchups table
+    missing = [week for week in weeks if (opponents[row_of[week]] < 0).all()]
+    if missing:
+        week_cols = ', '.join(f'week_{w}' for w in missing if w <= REGULAR_SEASON_WEEKS)
+        if week_cols:
+            for row in conn.execute(f'SELECT owner_ID, {week_cols} FROM Matchups'):
+                owner = row[0]
+                for week, opponent in zip(missing, row[1:]):
+                    if owner in index and opponent in index:
+                        opponents[row_of[week], index[owner]] = index[opponent]
+
+    return League(owners, divisions, weeks, scores, opponents, draft_order or load_draft_order(conn))
+
+
+def compute_records(league):
+    """Score every game in the league in one pass.
+
+    Returns per-owner totals plus head-to-head matrices used by the tiebreakers.
+    """
+    n = len(league.owners)
+    opponents = league.opponents
+    scheduled = opponents >= 0
+    safe_opp = np.where(scheduled, opponents, 0)
+    points = league.scores
+    opp_points = np.take_along_axis(points, safe_opp, axis=1)
+    played = scheduled & ~np.isnan(points) & ~np.isnan(opp_points)
+
+    won = played & (points > opp_points)
+    lost = played & (points < opp_points)
+    tied = played & (points == opp_points)
+    pf = np.where(played, points, 0.0)
+    pa = np.where(played, opp_points, 0.0)
+
+    same_division = league.divisions[safe_opp] == league.divisions[None, :]
+    div_games = played & same_division
+
+    # head-to-head: h2h_*[i, j] covers games owner i played against owner j
+    w_idx, o_idx = np.nonzero(played)
+    opp_idx = opponents[w_idx, o_idx]
+    h2h_games = np.zeros((n, n))
+    h2h_wins = np.zeros((n, n))
+    h2h_points = np.zeros((n, n))
+    np.add.at(h2h_games, (o_idx, opp_idx), 1)
+    np.add.at(h2h_wins, (o_idx, opp_idx), won[w_idx, o_idx] + 0.5 * tied[w_idx, o_idx])
+    np.add.at(h2h_points, (o_idx, opp_idx), points[w_idx, o_idx])
+
+    return {
+        'wins': won.sum(axis=0),
+        'losses': lost.sum(axis=0),
+        'ties': tied.sum(axis=0),
+        'pf': pf.sum(axis=0),
+        'pa': pa.sum(axis=0),
+        'div_wins': (div_games & won).sum(axis=0) + 0.5 * (div_games & tied).sum(axis=0),
+        'div_games': div_games.sum(axis=0),
+        'h2h_games': h2h_games,
+        'h2h_wins': h2h_wins,
+        'h2h_points': h2h_points,
+        # a week only counts once every scheduled game in it has been scored
+        'weeks_played': [int(w) for w in league.weeks[scheduled.any(axis=1) & (played == scheduled).all(axis=1)]],
+        'weeks_partial': [int(w) for w in league.weeks[played.any(axis=1) & (played != scheduled).any(axis=1)]],
+    }
+
+
+def draft_position(league, team, tied):
+    """Original draft slot; a later pick wins the final tiebreaker"""
+    owner = league.owners[team]
+    if not league.draft_order or owner not in league.draft_order:
+        names = ', '.join(league.owners[t] for t in tied)
+        raise ValueError(f"Tie between {names} comes down to original draft order, "
+                         f"but no draft order is known for {owner}; pass --draft-order")
+    return league.draft_order.index(owner)
+
+
+def _keep_best(tied, values):
+    best = max(values[t] for t in tied)
+    return [t for t in tied if values[t] == best]
+
+
+def _pick_best(league, records, tied):
+    """Tiebreaker for teams with identical records; returns the team that ranks first"""
+    if len(tied) == 1:
+        return tied[0]
+    games = records['h2h_games'][np.ix_(tied, tied)]
+    wins = records['h2h_wins'][np.ix_(tied, tied)]
+
+    if len(tied) == 2:
+        a, b = tied
+        criteria = []
+        if games[0, 1]:
+            criteria.append({a: wins[0, 1] / games[0, 1], b: wins[1, 0] / games[1, 0]})
+            criteria.append({a: records['h2h_points'][a, b] / games[0, 1],
+                             b: records['h2h_points'][b, a] / games[1, 0]})
+        if league.divisions[a] == league.divisions[b]:
+            criteria.append({t: records['div_wins'][t] / max(records['div_games'][t], 1) for t in tied})
+    else:
+        others = ~np.eye(len(tied), dtype=bool)
+        played_all = (games > 0) | ~others
+        # 1) clear winner: played and beat every other tied team, never lost to one
+        for i, team in enumerate(tied):
+            if played_all[i].all() and (wins[i][others[i]] >= 1).all() and \
+                    (wins[i][others[i]] == games[i][others[i]]).all():
+                return team
+        # 2) clear loser: played every other tied team and lost every one of those games
+        for i, team in enumerate(tied):
+            if played_all[i].all() and (wins[i][others[i]] == 0).all():
+                return _pick_best(league, records, [t for t in tied if t != team])
+        criteria = []
+        # 3) head-to-head only when every pair met the same number of times
+        pair_games = games[others]
+        if pair_games.size and (pair_games == pair_games[0]).all() and pair_games[0] > 0:
+            totals = wins.sum(axis=1) / games.sum(axis=1)
+            criteria.append({t: totals[i] for i, t in enumerate(tied)})
+
+    criteria.append({t: records['pf'][t] for t in tied})
+    criteria.append({t: -records['pa'][t] for t in tied})
+    for values in criteria:
+        remaining = _keep_best(tied, values)
+        if len(remaining) < len(tied):
+            return _pick_best(league, records, remaining)
+    values = {t: draft_position(league, t, tied) for t in tied}
+    return _keep_best(tied, values)[0]
+
+
+def rank_teams(league, records, teams):
+    """Order teams best to worst by record, breaking ties one position at a time"""
+    wins, losses, ties = records['wins'], records['losses'], records['ties']
+    games = np.maximum(wins + losses + ties, 1)
+    pct = (wins + 0.5 * ties) / games
+
+    groups = {}
+    for team in teams:
+        groups.setdefault((wins[team], losses[team], ties[team]), []).append(team)
+
+    ordered = []
+    for key in sorted(groups, key=lambda k: (-pct[groups[k][0]], -k[0])):
+        tied = list(groups[key])
+        while tied:
+            best = _pick_best(league, records, tied)
+            ordered.append(best)
+            tied.remove(best)
+    return ordered
+
+
+def seed_playoffs(league, records):
+    """Division champions, wildcards and loser bracket, as FinalStandings columns"""
+    champions = []
+    for division in sorted(set(league.divisions)):
+        members = [t for t in range(len(league.owners)) if league.divisions[t] == division]
+        champions.append(rank_teams(league, records, members)[0])
+    champions = rank_teams(league, records, champions)
+    rest = rank_teams(league, records, [t for t in range(len(league.owners)) if t not in champions])
+
+    seeds = {}
+    for i, team in enumerate(champions, 1):
+        seeds[f'Division_{i}'] = league.owners[team]
+    for i, team in enumerate(rest[:4], 1):
+        seeds[f'Wildcard_{i}'] = league.owners[team]
+    for i, team in enumerate(rest[4:], 1):
+        seeds[f'LoserBracket_{i}'] = league.owners[team]
+    return seeds
+
+
+def ensure_applied_table(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS StandingsWeeks (
+            week INTEGER PRIMARY KEY,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def write_standings(conn, league, records, seeds, weeks_applied, replace_weeks=True):
+    """Write Standings, FinalStandings and the applied-weeks list in one transaction"""
+    rows = [
+        (owner, int(records['wins'][i]), int(records['losses'][i]), int(records['ties'][i]),
+         float(records['pf'][i]), float(records['pa'][i]), str(league.divisions[i]))
+        for i, owner in enumerate(league.owners)
+    ]
+    columns = ', '.join(f'"{col}"' for col in seeds)
+    placeholders = ', '.join('?' for _ in seeds)
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        ensure_applied_table(conn)
+        conn.executemany('''
+            INSERT OR REPLACE INTO Standings (Team_ID, Wins, Losses, Ties, PF, PA, Division)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        conn.execute('DELETE FROM FinalStandings')
+        if seeds:
+            conn.execute(f'INSERT INTO FinalStandings (id, {columns}) VALUES (1, {placeholders})',
+                         list(seeds.values()))
+        if replace_weeks:
+            conn.execute('DELETE FROM StandingsWeeks')
+        conn.executemany('INSERT OR IGNORE INTO StandingsWeeks (week) VALUES (?)',
+                         [(week,) for week in weeks_applied])
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+
+def check_complete(records):
+    if records['weeks_partial']:
+        weeks = ', '.join(str(w) for w in records['weeks_partial'])
+        raise ValueError(f"Week(s) {weeks} have scheduled games without WeeklyResults; "
+                         f"score every game before updating Standings")
+
+
+def recalculate(conn, weeks=None, draft_order=None):
+    """Rebuild Standings and FinalStandings from scratch for the given weeks"""
+    league = load_league(conn, weeks, draft_order)
+    records = compute_records(league)
+    check_complete(records)
+    # before any game is scored every team is tied, so there is nothing to seed yet
+    seeds = seed_playoffs(league, records) if records['weeks_played'] else {}
+    write_standings(conn, league, records, seeds, records['weeks_played'])
+    return league, records, seeds
+
+
+def applied_weeks(conn):
+    ensure_applied_table(conn)
+    return [row[0] for row in conn.execute('SELECT week FROM StandingsWeeks ORDER BY week')]
+
+
+def apply_week(conn, week, draft_order=None):
+    """Add a single finalized week on top of the current Standings rows"""
+    done = applied_weeks(conn)
+    if week in done:
+        raise ValueError(f"Week {week} has already been applied to Standings")
+    if not done:
+        legacy = conn.execute('''
+            SELECT COUNT(*) FROM Standings
+            WHERE COALESCE(Wins, 0) + COALESCE(Losses, 0) + COALESCE(Ties, 0) > 0
+               OR COALESCE(PF, 0) != 0 OR COALESCE(PA, 0) != 0
+        ''').fetchone()[0]
+        if legacy:
+            raise ValueError("Standings has totals but no weeks recorded in StandingsWeeks (written by the "
+                             "old recalculate-standings scripts); run a full --weeks 1-N recalculation first")
+
+    league = load_league(conn, [week], draft_order)
+    delta = compute_records(league)
+    check_complete(delta)
+    if not delta['weeks_played']:
+        raise ValueError(f"No scored matchups found for week {week}")
+
+    current = {row[0]: row[1:] for row in conn.execute(
+        'SELECT Team_ID, Wins, Losses, Ties, PF, PA FROM Standings')}
+    totals = np.array([[v or 0 for v in current.get(owner, (0, 0, 0, 0, 0))] for owner in league.owners],
+                      dtype=float)
+    records = dict(delta)
+    for col, name in enumerate(('wins', 'losses', 'ties', 'pf', 'pa')):
+        records[name] = totals[:, col] + delta[name]
+
+    # seeding needs head-to-head history, so re-read it for every applied week
+    history = compute_records(load_league(conn, done + [week], draft_order))
+    for name in ('div_wins', 'div_games', 'h2h_games', 'h2h_wins', 'h2h_points'):
+        records[name] = history[name]
+
+    seeds = seed_playoffs(league, records)
+    write_standings(conn, league, records, seeds, [week], replace_weeks=False)
+    return league, records, seeds
+
+
+def print_standings(league, records, seeds):
+    if not records['weeks_played']:
+        print("  No weeks fully scored yet; Standings zeroed and FinalStandings cleared")
+        return
+    order = rank_teams(league, records, range(len(league.owners)))
+    for team in order:
+        print(f"  {league.owners[team]}: {records['wins'][team]:.0f}W-{records['losses'][team]:.0f}L-"
+              f"{records['ties'][team]:.0f}T, PF: {records['pf'][team]:.1f}, PA: {records['pa'][team]:.1f}")
+    print("\nPlayoff seeding:")
+    for slot, owner in seeds.items():
+        print(f"  {slot}: {owner}")
+
+
+def parse_weeks(text):
+    if '-' in text:
+        start, end = text.split('-', 1)
+        return list(range(int(start), int(end) + 1))
+    return [int(w) for w in text.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--weeks', default=f'1-{REGULAR_SEASON_WEEKS}', help="e.g. 1-3 or 1,2,5")
+    parser.add_argument('--apply-week', type=int, help="add one week to the existing standings")
+    parser.add_argument('--draft-order', help="round 1 owner_IDs, first pick first, e.g. A1,B1,C1,...; "
+                                              "defaults to the Draft table")
+    args = parser.parse_args()
+    draft_order = args.draft_order.split(',') if args.draft_order else None
+
+    conn = sqlite3.connect(args.db, isolation_level=None)
+    try:
+        if args.apply_week:
+            print(f"=== Applying Week {args.apply_week} to Standings ===")
+            result = apply_week(conn, args.apply_week, draft_order)
+        else:
+            print(f"=== Recalculating Standings for weeks {args.weeks} ===")
+            result = recalculate(conn, parse_weeks(args.weeks), draft_order)
+        print_standings(*result)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()